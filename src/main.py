@@ -1,8 +1,53 @@
 import os
 import json
 import pdfplumber
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict
 from pathlib import Path
-from scraper import parse_datasheets
+from typing import Iterator, List, Tuple
+from scraper import Cable, parse_datasheets
+
+# Built once and shared by every output file instead of per json.dump call
+_encode_json = json.JSONEncoder(indent=2).encode
+
+def _extract_text(pdf_path: Path) -> str:
+    """
+    Extracts the text of every page in a PDF, separated by page break markers.
+    Runs in a worker process, so it must stay a top-level function.
+    """
+    with pdfplumber.open(pdf_path) as pdf:
+        parts = []
+        append = parts.append
+        for page in pdf.pages:
+            # extract_text() returns None for pages without a text layer
+            append(page.extract_text() or "")
+            append("\n--- PAGE BREAK ---\n")
+    return "".join(parts)
+
+def _iter_pdf_texts(pdf_files: List[Path], extracted: List[str]) -> Iterator[Tuple[str, str]]:
+    """
+    Yields (file name, text) for every readable PDF in input order and records
+    its name in `extracted`. Files are extracted in worker processes, so the
+    caller can parse one file while the following ones are still being read.
+    """
+    # Text extraction is CPU-bound, so spread the files across processes
+    max_workers = min(len(pdf_files), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {pdf_path: executor.submit(_extract_text, pdf_path) for pdf_path in pdf_files}
+        for pdf_path, future in futures.items():
+            print(f"Reading file: {pdf_path.name}")
+            try:
+                text = future.result()
+            except Exception as e:
+                print(f"--> Failed to read {pdf_path.name}. Error: {e}")
+                continue
+            extracted.append(pdf_path.name)
+            yield pdf_path.name, text
+
+def _write_json(output_path: Path, cable: Cable) -> None:
+    """Writes a single cable record to its own JSON file."""
+    with open(output_path, 'w', encoding='utf-8', buffering=1 << 16) as f:
+        f.write(_encode_json(asdict(cable)))
 
 def main():
     """
@@ -19,7 +64,6 @@ def main():
         print(f"Error: Input directory not found at '{data_dir}'")
         return
 
-    file_contents = {}
     pdf_files = list(data_dir.glob("*.pdf"))
 
     if not pdf_files:
@@ -28,41 +72,37 @@ def main():
 
     print("--- Starting PDF Scraping Process ---")
     
-    for pdf_path in pdf_files:
-        print(f"Reading file: {pdf_path.name}")
-        try:
-            with pdfplumber.open(pdf_path) as pdf:
-                full_text = "".join(page.extract_text() + "\n--- PAGE BREAK ---\n" for page in pdf.pages)
-                file_contents[pdf_path.name] = full_text
-        except Exception as e:
-            print(f"--> Failed to read {pdf_path.name}. Error: {e}")
-
-    if not file_contents:
+    # Parsing runs in this process and overlaps with extraction of the next files
+    extracted = []
+    all_cables_data = parse_datasheets(_iter_pdf_texts(pdf_files, extracted), cache_dir=output_dir / ".parse_cache")
+
+    if not extracted:
         print("Could not extract text from any PDF files. Exiting.")
         return
 
-    print("\nProcessing extracted text...")
-    all_cables_data = parse_datasheets(file_contents)
-
     if not all_cables_data:
         print("No cable data was extracted. Exiting.")
         return
 
     print(f"\n--- Saving {len(all_cables_data)} JSON Files ---")
     
-    for cable in all_cables_data:
-        original_filename = Path(cable['datasheetURL']).stem
-        fiber_count = cable['fiberCount']
-        
-        output_filename = f"{original_filename}_{fiber_count}F.json"
-        output_path = output_dir / output_filename
-
-        try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(cable, f, indent=2)
-            print(f"Saved: {output_path.name}")
-        except Exception as e:
-            print(f"--> Failed to write {output_filename}. Error: {e}")
+    # Many small files: overlap their open/write/close calls in I/O threads
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        pending = []
+        for cable in all_cables_data:
+            original_filename = Path(cable.datasheetURL).stem
+            fiber_count = cable.fiberCount
+            
+            output_filename = f"{original_filename}_{fiber_count}F.json"
+            output_path = output_dir / output_filename
+            pending.append((output_filename, executor.submit(_write_json, output_path, cable)))
+
+        for output_filename, future in pending:
+            try:
+                future.result()
+                print(f"Saved: {output_filename}")
+            except Exception as e:
+                print(f"--> Failed to write {output_filename}. Error: {e}")
 
     print("\n--- Success! ---")
     print(f"All files saved in: {output_dir}")
@@ -1,77 +1,189 @@
-import json
+import hashlib
 import re
-from typing import List, Dict, Any, Optional
+import shelve
+from contextlib import nullcontext
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Dict, Iterable, Mapping, Optional, Tuple, Union
+
+# Part of every parse cache key; bump it whenever the parsing output changes
+_PARSER_VERSION = "4"
+
+_RE_DESC = re.compile(r"Technical Specifications\s*\n(.*?)\s*\n", re.IGNORECASE | re.DOTALL)
+_RE_WS = re.compile(r'\s+')
+_RE_SPLIT = re.compile(r',,|,|\s{2,}')
+_RE_DIGITS = re.compile(r'\d+')
+_RE_LETTER = re.compile(r'[a-zA-Z]')
+_RE_FC_BYTES = re.compile(rb'(\d+)F')
+_RE_TUBES_COUNT = re.compile(r"\s*.*?(\d+)")
+_RE_FTYPE = re.compile(r"Fibre Type\s*\"?([^\n\"]*G\.65\d[^\n\"]*|OM\d)", re.IGNORECASE)
+_RE_TUBECOL = re.compile(r"Tube Colour\s*.*\n\s*([\w\s,]+)\n", re.IGNORECASE)
+_RE_TUBECOL_SPLIT = re.compile(r'\s{2,}|,')
+_RE_DIAM = re.compile(r"Cable Diameter\s*.*?(\d+\.\d+\s*±\s*\d+\.\d+\s*mm)", re.IGNORECASE)
+
+# Fallback value patterns, tried in order after the parameter name
+_TENSILE_REGEXES = [
+    re.compile(r"(?:Installation|Short Term)\s*[:\s]*(\d+\s*N)", re.IGNORECASE | re.DOTALL),
+    re.compile(r"(\d+\s*N)", re.IGNORECASE | re.DOTALL),
+]
+_CRUSH_REGEXES = [
+    re.compile(r"(\d+\s*N[/0-9\s.xcm]+)", re.IGNORECASE | re.DOTALL),
+    re.compile(r"(\d+\s*N)", re.IGNORECASE | re.DOTALL),
+]
+
+# Lowercased row labels read from the specification table
+_TABLE_PARAMETERS = ("tensile strength", "crush resistance", "cable diameter")
+_RE_TABLE_LABELS = re.compile('|'.join(map(re.escape, _TABLE_PARAMETERS)))
+
+def _split_cells(line: str) -> List[str]:
+    """Splits a table row on ',,', ',' and runs of two or more whitespace characters."""
+    # The space is the only printable whitespace, so a printable row without a
+    # double space can only be separated by commas and plain str.split is exact
+    if line.isprintable() and '  ' not in line:
+        return line.replace(',,', ',').split(',')
+    return _RE_SPLIT.split(line)
+
+@lru_cache(maxsize=256)
+def _compile_pattern(pattern: str, flags: int = 0) -> re.Pattern:
+    """Compiles a dynamically built pattern once and reuses it on later calls."""
+    return re.compile(pattern, flags)
 
 def _get_cable_description(text: str) -> str:
     """Extracts the main cable description from the text."""
-    match = re.search(r"Technical Specifications\s*\n(.*?)\s*\n", text, re.IGNORECASE | re.DOTALL)
+    match = _RE_DESC.search(text)
     if match:
-        return re.sub(r'\s+', ' ', match.group(1)).strip()
+        return _RE_WS.sub(' ', match.group(1)).strip()
     return "N/A"
 
-def _get_value_from_table(text: str, fiber_counts: List[str], current_fc: str, parameter: str) -> Optional[str]:
-    """Extracts a parameter's value for a specific fiber count from a table."""
-    lines = text.split('\n')
-    header_index = -1
-    col_map = {}
+@dataclass(slots=True)
+class Cable:
+    """One cable record per fiber count; field names match the output JSON keys."""
+    cableID: int
+    cableDescription: str
+    fiberCount: str
+    typeofCable: str
+    span: str
+    tube: str
+    tubeColorCoding: str
+    fiberType: str
+    diameter: str
+    tensile: str
+    nescCondition: str
+    crush: str
+    blowingLength: str
+    datasheetURL: str
+    isActive: str
 
+@dataclass
+class _TableHeader:
+    """Location of the "Fibre Count" header row and the column of each fiber count."""
+    index: int
+    col_map: Dict[str, int]
+
+def _find_table_header(lines: List[str], fiber_counts: List[str]) -> Optional[_TableHeader]:
+    """Finds the fiber count header row of the specification table, if any."""
+    if not fiber_counts: return None
+    # One alternation scans each line for every fiber count in a single pass
+    fc_re = _compile_pattern('|'.join(re.escape(fc) + 'F' for fc in fiber_counts))
     for i, line in enumerate(lines):
-        if "Fibre Count" in line and any(fc + "F" in line for fc in fiber_counts):
-            header_index = i
-            header_parts = re.split(r',,|,|\s{2,}', line.strip())
+        if "Fibre Count" in line and fc_re.search(line) is not None:
+            col_map = {}
+            header_parts = _split_cells(line.strip())
             for fc in fiber_counts:
                 for idx, part in enumerate(header_parts):
                     if fc + "F" in part:
                         col_map[fc] = idx
-            break
-            
-    if header_index == -1: return None
-
-    for i in range(header_index + 1, len(lines)):
-        line = lines[i]
-        if parameter.lower() in line.lower():
-            value_parts = re.split(r',,|,|\s{2,}', line.strip())
-            if current_fc in col_map:
-                fc_col = col_map.get(current_fc, 1)
-                target_index = fc_col if parameter.lower() in value_parts[0].lower() else fc_col - 1
-                if 0 <= target_index < len(value_parts):
-                    value = value_parts[target_index].replace('$', '').replace('"', '').strip()
-                    if not value and target_index > 0:
-                        return value_parts[target_index-1].replace('$', '').replace('"', '').strip()
-                    return value
-            if len(value_parts) > 1:
-                return value_parts[1].replace('$', '').replace('"', '').strip()
+            return _TableHeader(i, col_map)
+    return None
+
+def _get_cell_value(value_parts: List[str], fc_col: Optional[int], label_in_first_cell: bool) -> Optional[str]:
+    """Picks the cell belonging to a fiber count column from a split table row."""
+    if fc_col is not None:
+        target_index = fc_col if label_in_first_cell else fc_col - 1
+        if 0 <= target_index < len(value_parts):
+            value = value_parts[target_index].replace('$', '').replace('"', '').strip()
+            if not value and target_index > 0:
+                return value_parts[target_index-1].replace('$', '').replace('"', '').strip()
+            return value
+    if len(value_parts) > 1:
+        return value_parts[1].replace('$', '').replace('"', '').strip()
     return None
 
-def _get_generic_value(text: str, parameter: str, patterns: List[str]) -> str:
-    """Extracts a generic value using a list of regex patterns."""
+def _parse_table(lines: List[str], lower_lines: List[str], header: Optional[_TableHeader], fiber_counts: List[str]) -> Dict[str, Dict[str, str]]:
+    """
+    Reads every table parameter for every fiber count in a single pass over the lines.
+    Returns {parameter: {fiber count: value}}; for each fiber count the first row
+    below the header that yields a value wins.
+    """
+    table = {parameter: {} for parameter in _TABLE_PARAMETERS}
+    if header is None: return table
+    col_map = header.col_map
+
+    # Sweep the lines below the header once for all labels instead of testing
+    # every label against every line; only rows that carry a label are split
+    first = header.index + 1
+    body = '\n'.join(lower_lines[first:])
+    i, pos, last_row = first, 0, None
+    for match in _RE_TABLE_LABELS.finditer(body):
+        i += body.count('\n', pos, match.start())
+        pos = match.start()
+        parameter = match.group()
+        values = table[parameter]
+        if (i, parameter) == last_row or len(values) == len(fiber_counts): continue
+        last_row = (i, parameter)
+        value_parts = _split_cells(lines[i].strip())
+        label_in_first_cell = parameter in value_parts[0].lower()
+        for fc in fiber_counts:
+            if fc in values: continue
+            value = _get_cell_value(value_parts, col_map.get(fc), label_in_first_cell)
+            if value is not None: values[fc] = value
+    return table
+
+def _get_generic_value(text: str, parameter: str, patterns: List[re.Pattern]) -> str:
+    """
+    Extracts a generic value using a list of compiled patterns, each searched
+    from the first occurrence of the parameter name onwards.
+    """
+    # Anchoring on the literal name replaces a lazy [\s\S]*? prefix, which made
+    # the regex engine backtrack across the rest of the document
+    anchor = _compile_pattern(re.escape(parameter), re.IGNORECASE).search(text)
+    if not anchor: return "N/A"
     for pattern in patterns:
-        match = re.search(f"{parameter}{pattern}", text, re.IGNORECASE | re.DOTALL)
+        match = pattern.search(text, anchor.end())
         if match: return match.group(1).strip()
     return "N/A"
 
-def _get_tube_type(text: str) -> str:
+def _get_tube_type(text: str, text_lower: str) -> str:
     """Determines if the cable is Unitube or Multitube."""
     if "Unitube" in text: return "Unitube"
     if "Multitube" in text: return "Multitube"
-    match = re.search(r"Number of loose tubes\s*.*?(\d+)", text, re.IGNORECASE)
-    if match: return "Unitube" if int(match.group(1)) == 1 else "Multitube"
+    label = "number of loose tubes"
+    start = text_lower.find(label)
+    while start != -1:
+        match = _RE_TUBES_COUNT.match(text_lower, start + len(label))
+        if match: return "Unitube" if int(match.group(1)) == 1 else "Multitube"
+        start = text_lower.find(label, start + 1)
     return "N/A"
 
 def _get_raw_fiber_type(text: str) -> str:
     """Gets the specific fiber standard like G.652D."""
-    match = re.search(r"Fibre Type\s*\"?([^\n\"]*G\.65\d[^\n\"]*|OM\d)", text, re.IGNORECASE)
+    match = _RE_FTYPE.search(text)
     if match:
         return match.group(1).strip().replace('$', '').replace('"', '')
     return "N/A"
 
 def _get_environmental_performance(text: str) -> str:
     """Extracts the environmental performance data."""
-    match = re.search(r"Environmental Performance\s*([\s\S]*?)IEC-60794-1-22-F1", text)
-    if not match:
+    start = text.find("Environmental Performance")
+    if start == -1:
+        return "N/A"
+    start += len("Environmental Performance")
+    end = text.find("IEC-60794-1-22-F1", start)
+    if end == -1:
         return "N/A"
     
-    block = match.group(1)
+    block = text[start:end].lstrip()
     lines = [line.strip() for line in block.split('\n') if line.strip()]
     
     # Extract temperatures and their conditions
@@ -88,42 +200,50 @@ def _get_environmental_performance(text: str) -> str:
 
 def _get_tube_colors(text: str) -> str:
     """Extracts the tube color coding."""
-    match = re.search(r"Tube Colour\s*.*\n\s*([\w\s,]+)\n", text, re.IGNORECASE)
+    match = _RE_TUBECOL.search(text)
     if match:
-        colors = [color.strip() for color in re.split(r'\s{2,}|,', match.group(1).strip()) if color]
+        colors = [color.strip() for color in _RE_TUBECOL_SPLIT.split(match.group(1).strip()) if color]
         return ", ".join(colors)
     return "N/A"
 
-def _build_descriptive_strings(text: str, base_description: str, fc: str) -> (str, str):
-    """Builds the detailed cableDescription and typeofCable strings."""
+def _build_type_of_cable(flags: Tuple[bool, bool, bool], tube_type: str) -> str:
+    """
+    Builds the typeofCable string, which is the same for every fiber count.
+    `flags` tells whether the text mentions Indoor, LSZH and Armoured.
+    """
+    is_indoor, is_lszh, is_armoured = flags
     keywords = []
-    if "Indoor" in text: keywords.append("Indoor")
-    if "LSZH" in text: keywords.append("LSZH")
-    if "Armoured" in text: keywords.append("armoured")
+    if is_indoor: keywords.append("Indoor")
+    if is_lszh: keywords.append("LSZH")
+    if is_armoured: keywords.append("armoured")
     
-    tube_type = _get_tube_type(text)
     if tube_type == "Unitube":
         keywords.append("unitube")
     elif tube_type == "Multitube":
         keywords.append("loose-tube")
 
     keywords.append("cable")
-    typeofCable_str = " ".join(keywords).capitalize()
-    
-    # Build main description
-    desc_suffix = "Fibre Loose Tube" if "loose-tube" in typeofCable_str.lower() else "Fibre Cable"
-    cableDescription_str = f"{fc}F {base_description.replace(f'{fc}F','').strip()} {desc_suffix}"
-    
-    return cableDescription_str, typeofCable_str
+    return " ".join(keywords).capitalize()
+
+def _build_cable_description(base_description: str, fc: str, desc_suffix: str) -> str:
+    """Builds the detailed cableDescription string for one fiber count."""
+    return f"{fc}F {base_description.replace(f'{fc}F','').strip()} {desc_suffix}"
 
-def _parse_single_datasheet(filename: str, text: str) -> List[Dict[str, Any]]:
-    """Parses text from a single datasheet, returning a list of cable data dicts."""
+def _parse_single_datasheet(filename: str, text: str) -> List[Cable]:
+    """Parses text from a single datasheet, returning one Cable per fiber count."""
     results = []
     base_description = _get_cable_description(text)
     
-    title_fcs = re.findall(r'\d+', re.split(r'[a-zA-Z]', base_description)[0])
-    text_fcs = re.findall(r'(\d+)F', text)
-    fiber_counts = sorted(list(set(title_fcs + text_fcs)), key=int)
+    title_fcs = _RE_DIGITS.findall(_RE_LETTER.split(base_description, 1)[0])
+    # Key by the integer value so each int() runs once and the sort compares ints
+    seen = {}
+    for fc in title_fcs: seen.setdefault(int(fc), fc)
+    # The "24F" scan runs over a Latin-1 view of the text; fiber counts are ASCII
+    # and byte-mode matching is cheaper than walking str code points
+    for digits in _RE_FC_BYTES.findall(text.encode('latin-1', 'replace')):
+        count = int(digits)
+        if count not in seen: seen[count] = digits.decode('ascii')
+    fiber_counts = [seen[count] for count in sorted(seen)]
 
     if not fiber_counts: return []
 
@@ -131,53 +251,93 @@ def _parse_single_datasheet(filename: str, text: str) -> List[Dict[str, Any]]:
     raw_fiber_type = _get_raw_fiber_type(text)
     env_conditions = _get_environmental_performance(text)
     tube_colors = _get_tube_colors(text)
-    tube_type_str = _get_tube_type(text)
+    tube_type_str = _get_tube_type(text, text.lower())
+    keyword_flags = ("Indoor" in text, "LSZH" in text, "Armoured" in text)
+    typeofCable = _build_type_of_cable(keyword_flags, tube_type_str)
+    desc_suffix = "Fibre Loose Tube" if "loose-tube" in typeofCable.lower() else "Fibre Cable"
+
+    # Split and lowercase the document once and read the whole table in one pass
+    lines = text.split('\n')
+    lower_lines = [line.lower() for line in lines]
+    header = _find_table_header(lines, fiber_counts)
+    table = _parse_table(lines, lower_lines, header, fiber_counts)
 
     for fc in fiber_counts:
-        tensile_patterns = [r"[\s\S]*?(?:Installation|Short Term)\s*[:\s]*(\d+\s*N)", r"[\s\S]*?(\d+\s*N)"]
-        crush_patterns = [r"[\s\S]*?(\d+\s*N[/0-9\s.xcm]+)", r"[\s\S]*?(\d+\s*N)"]
-        
-        tensile = _get_value_from_table(text, fiber_counts, fc, 'Tensile Strength') or _get_generic_value(text, 'Tensile Strength', tensile_patterns)
-        crush = _get_value_from_table(text, fiber_counts, fc, 'Crush Resistance') or _get_generic_value(text, 'Crush Resistance', crush_patterns)
-        diameter = _get_value_from_table(text, fiber_counts, fc, 'Cable Diameter')
+        tensile = table['tensile strength'].get(fc) or _get_generic_value(text, 'Tensile Strength', _TENSILE_REGEXES)
+        crush = table['crush resistance'].get(fc) or _get_generic_value(text, 'Crush Resistance', _CRUSH_REGEXES)
+        diameter = table['cable diameter'].get(fc)
         
         if not diameter:
-            match = re.search(r"Cable Diameter\s*.*?(\d+\.\d+\s*±\s*\d+\.\d+\s*mm)", text, re.IGNORECASE)
+            match = _RE_DIAM.search(text)
             if match: diameter = match.group(1)
 
-        cableDesc, typeofCable = _build_descriptive_strings(text, base_description, fc)
-
-        data = {
-            "cableID": 0,
-            "cableDescription": cableDesc,
-            "fiberCount": f"{fc}F",
-            "typeofCable": typeofCable,
-            "span": "N/A",
-            "tube": tube_type_str,
-            "tubeColorCoding": tube_colors,
-            "fiberType": raw_fiber_type,
-            "diameter": diameter.replace('*', '±') if diameter else "N/A",
-            "tensile": tensile,
-            "nescCondition": env_conditions,
-            "crush": crush.replace('$', '') if crush else "N/A",
-            "blowingLength": "N/A",
-            "datasheetURL": filename,
-            "isActive": "Y"
-        }
-        results.append(data)
+        cableDesc = _build_cable_description(base_description, fc, desc_suffix)
+
+        results.append(Cable(
+            cableID=0,
+            cableDescription=cableDesc,
+            fiberCount=f"{fc}F",
+            typeofCable=typeofCable,
+            span="N/A",
+            tube=tube_type_str,
+            tubeColorCoding=tube_colors,
+            fiberType=raw_fiber_type,
+            diameter=diameter.replace('*', '±') if diameter else "N/A",
+            tensile=tensile,
+            nescCondition=env_conditions,
+            crush=crush.replace('$', '') if crush else "N/A",
+            blowingLength="N/A",
+            datasheetURL=filename,
+            isActive="Y",
+        ))
     return results
 
-def parse_datasheets(files: Dict[str, str]) -> List[Dict[str, Any]]:
-    """Main function to parse multiple datasheet files."""
-    all_cables = []
-    current_id = 0
-    for filename, content in files.items():
+def _open_cache(cache_dir: Optional[Path]):
+    """Opens the on-disk parse cache, falling back to an in-memory one if it is unusable."""
+    if cache_dir is not None:
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            return shelve.open(str(cache_dir / "cables"))
+        except Exception as e:
+            print(f"--> Could not open parse cache in {cache_dir}, continuing without it. Error: {e}")
+    return nullcontext({})
+
+def _parse_cached(filename: str, content: str, cache) -> List[Cable]:
+    """Parses a datasheet, reusing the cables stored for identical text."""
+    key = hashlib.blake2b(f"{_PARSER_VERSION}\0{content}".encode(), digest_size=16).hexdigest()
+    try:
+        cached = cache.get(key)
+    except Exception:
+        # An unreadable entry (corrupt file, stale pickle) is treated as a miss
+        cached = None
+    if cached is None:
+        cached = _parse_single_datasheet(filename, content)
         try:
-            parsed_cables = _parse_single_datasheet(filename, content)
-            for cable in parsed_cables:
-                cable['cableID'] = current_id
-                all_cables.append(cable)
-                current_id += 1
+            cache[key] = cached
         except Exception as e:
-            print(f"--> Could not process file {filename}. Error: {e}")
-    return all_cables
\ No newline at end of file
+            print(f"--> Could not cache {filename}. Error: {e}")
+    return [replace(cable, datasheetURL=filename) for cable in cached]
+
+def parse_datasheets(files: Union[Mapping[str, str], Iterable[Tuple[str, str]]], cache_dir: Optional[Path] = None) -> List[Cable]:
+    """
+    Main function to parse multiple datasheet files, given as a {file name: text}
+    mapping or as (file name, text) pairs; a generator of pairs lets parsing
+    start before every file has been read.
+    Parsed cables are cached by a hash of the text, so duplicate datasheets are
+    parsed once. With `cache_dir` the cache persists across runs.
+    """
+    if isinstance(files, Mapping):
+        files = files.items()
+    all_cables = []
+    current_id = 0
+    with _open_cache(cache_dir) as cache:
+        for filename, content in files:
+            try:
+                parsed_cables = _parse_cached(filename, content, cache)
+                for cable in parsed_cables:
+                    cable.cableID = current_id
+                    all_cables.append(cable)
+                    current_id += 1
+            except Exception as e:
+                print(f"--> Could not process file {filename}. Error: {e}")
+    return all_cables